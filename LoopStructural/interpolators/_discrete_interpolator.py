@@ -5,7 +5,7 @@ import logging
 
 from time import time
 import numpy as np
-from scipy.sparse import coo_matrix, bmat, eye
+from scipy.sparse import coo_matrix, csr_matrix, eye
 from scipy.sparse import linalg as sla
 from scipy.sparse.linalg import norm
 from sklearn.preprocessing import normalize
@@ -19,6 +19,100 @@ logger = getLogger(__name__)
 
 from ._geological_interpolator import GeologicalInterpolator
 
+try:
+    from numba import njit
+
+    use_numba = True
+except ImportError:
+    use_numba = False
+
+
+def _pack_constraints_loop(A, w, scale, rows, cols, out_A, out_row, out_col, nnz):
+    """Write the weighted non zero, non nan entries of a constraint block
+    into the sparse matrix buffers in a single pass. Returns the new number
+    of entries in the buffers. Compiled with numba when it is available.
+    """
+    for i in range(A.shape[0]):
+        for j in range(A.shape[1]):
+            v = A[i, j] * w[i] / scale
+            if v == 0 or np.isnan(v):
+                continue
+            out_A[nnz] = v
+            out_row[nnz] = rows[i, j]
+            out_col[nnz] = cols[i, j]
+            nnz += 1
+    return nnz
+
+
+def _pack_constraints_numpy(A, w, scale, rows, cols, out_A, out_row, out_col, nnz):
+    """Write the weighted non zero, non nan entries of a constraint block
+    into the sparse matrix buffers. Returns the new number of entries in
+    the buffers. Used when numba is not installed.
+    """
+    aa = A * w[:, None] / scale
+    mask = aa != 0
+    mask[mask] = ~np.isnan(aa[mask])
+    k = int(np.count_nonzero(mask))
+    # boolean indexing reads the rows straight from a broadcast view
+    out_A[nnz : nnz + k] = aa[mask]
+    out_row[nnz : nnz + k] = rows[mask]
+    out_col[nnz : nnz + k] = cols[mask]
+    return nnz + k
+
+
+if use_numba:
+    _pack_constraints = njit(cache=True)(_pack_constraints_loop)
+else:
+    _pack_constraints = _pack_constraints_numpy
+
+
+def _border_matrix(ATA, C):
+    """Assemble the bordered matrix for the equality constrained system
+
+    | ATA CT |
+    | C   0  |
+
+    directly in csr format by writing the rows of each block into the
+    compressed arrays. The empty bottom right block is never created.
+
+    Parameters
+    ----------
+    ATA : scipy.sparse matrix
+        n x n normal equations matrix
+    C : scipy.sparse matrix
+        m x n equality constraint matrix
+
+    Returns
+    -------
+    scipy.sparse.csr_matrix
+        (n+m) x (n+m) bordered matrix
+    """
+    ATA = csr_matrix(ATA)
+    C = csr_matrix(C)
+    CT = C.T.tocsr()
+    n = ATA.shape[0]
+    m = C.shape[0]
+    ata_count = np.diff(ATA.indptr)
+    ct_count = np.diff(CT.indptr)
+    indptr = np.zeros(n + m + 1, dtype=np.int64)
+    np.cumsum(ata_count + ct_count, out=indptr[1 : n + 1])
+    indptr[n + 1 :] = indptr[n] + C.indptr[1:]
+    nnz = indptr[-1]
+    data = np.empty(nnz, dtype=np.float64)
+    indices = np.empty(nnz, dtype=np.int32)
+    # position of each entry of ATA and CT within the top block rows
+    start = np.repeat(indptr[:n] - ATA.indptr[:-1], ata_count)
+    pos = start + np.arange(ATA.nnz)
+    data[pos] = ATA.data
+    indices[pos] = ATA.indices
+    start = np.repeat(indptr[:n] + ata_count - CT.indptr[:-1], ct_count)
+    pos = start + np.arange(CT.nnz)
+    data[pos] = CT.data
+    indices[pos] = CT.indices + n
+    data[indptr[n] :] = C.data
+    indices[indptr[n] :] = C.indices
+    return csr_matrix((data, indices, indptr), shape=(n + m, n + m))
+
 
 class DiscreteInterpolator(GeologicalInterpolator):
     """ """
@@ -49,10 +143,15 @@ class DiscreteInterpolator(GeologicalInterpolator):
         # self.w = []
         self.solver = None
 
-        self.eq_const_C = []
-        self.eq_const_row = []
-        self.eq_const_col = []
-        self.eq_const_d = []
+        self._init_constraint_buffers()
+        # cholmod factor from the last solve, reused when the sparsity
+        # pattern of the system does not change
+        self._chol_cache = None
+
+        self.eq_const_C = np.zeros(0, dtype=np.float64)
+        self.eq_const_row = np.zeros(0, dtype=np.int32)
+        self.eq_const_col = np.zeros(0, dtype=np.int32)
+        self.eq_const_d = np.zeros(0, dtype=np.float64)
 
         self.equal_constraints = {}
         self.eq_const_c = 0
@@ -76,7 +175,7 @@ class DiscreteInterpolator(GeologicalInterpolator):
         int
             number of degrees of freedom, positve
         """
-        return len(self.support.nodes[self.region])
+        return int(np.count_nonzero(self.region))
 
     @property
     def region(self) -> np.ndarray:
@@ -92,8 +191,9 @@ class DiscreteInterpolator(GeologicalInterpolator):
 
     @property
     def region_map(self):
-        region_map = np.zeros(self.support.n_nodes).astype(int)
-        region_map[self.region] = np.array(range(0, len(region_map[self.region])))
+        region = self.region
+        region_map = np.zeros(self.support.n_nodes, dtype=int)
+        region_map[region] = np.arange(np.count_nonzero(region))
         return region_map
 
     def set_property_name(self, propertyname):
@@ -156,6 +256,75 @@ class DiscreteInterpolator(GeologicalInterpolator):
 
         """
         logger.debug("Resetting interpolation constraints")
+        self._init_constraint_buffers()
+
+    def _init_constraint_buffers(self, capacity=1024):
+        """
+        Allocate the buffers used to assemble the sparse interpolation matrix.
+        The buffers are kept between calls to build_matrix so that rebuilding
+        the system reuses the memory.
+
+        Parameters
+        ----------
+        capacity : int, optional
+            initial number of entries, by default 1024
+        """
+        self._nnz = 0
+        self._cap = capacity
+        # int32 indices halve the memory of the index arrays compared to
+        # the default int64 and are what scipy uses for the compressed formats
+        self._A_buf = np.empty(capacity, dtype=np.float64)
+        self._row_buf = np.empty(capacity, dtype=np.int32)
+        self._col_buf = np.empty(capacity, dtype=np.int32)
+
+    def _reserve(self, n):
+        """
+        Make sure the constraint buffers can hold another n entries, doubling
+        the capacity when they overflow
+
+        Parameters
+        ----------
+        n : int
+            number of entries to be added
+        """
+        if self._nnz + n <= self._cap:
+            return
+        cap = max(self._cap, 1)
+        while cap < self._nnz + n:
+            cap *= 2
+        self._A_buf = np.resize(self._A_buf, cap)
+        self._row_buf = np.resize(self._row_buf, cap)
+        self._col_buf = np.resize(self._col_buf, cap)
+        self._cap = cap
+
+    def _build_interpolation_matrix(self, shape):
+        """
+        Convert the entries in the constraint buffers into a csr matrix.
+        Constraint blocks are packed in the order they were added and each
+        block covers a contiguous range of rows, so the buffers are already
+        in row order and indptr is the cumulative count of entries per row.
+
+        Parameters
+        ----------
+        shape : tuple
+            shape of the interpolation matrix
+
+        Returns
+        -------
+        scipy.sparse.csr_matrix
+            interpolation matrix
+        """
+        nnz = self._nnz
+        rows = self._row_buf[:nnz]
+        cols = self._col_buf[:nnz]
+        data = self._A_buf[:nnz]
+        if np.any(rows[1:] < rows[:-1]):
+            logger.warning("Constraint rows are not ordered, sorting entries")
+            return coo_matrix((data, (rows, cols)), shape=shape).tocsr()
+        indptr = np.zeros(shape[0] + 1, dtype=np.int32)
+        np.cumsum(np.bincount(rows, minlength=shape[0]), out=indptr[1:])
+        # copy so that the matrix does not share memory with the buffers
+        return csr_matrix((data.copy(), cols.copy(), indptr), shape=shape)
 
     def add_constraints_to_least_squares(self, A, B, idc, w=1.0, name="undefined"):
         """
@@ -177,9 +346,13 @@ class DiscreteInterpolator(GeologicalInterpolator):
         list of constraint ids
 
         """
-        A = np.array(A)
-        B = np.array(B)
-        idc = np.array(idc)
+        # asarray avoids a copy when the caller already passes ndarrays, the
+        # inputs are not modified below
+        A = np.asarray(A, dtype=np.float64)
+        B = np.asarray(B, dtype=np.float64)
+        idc = np.asarray(idc)
+        idc_nan = idc.dtype.kind == "f" and np.isnan(idc).any()
+        idc = idc.astype(np.int32, copy=False)
         nr = A.shape[0]
         # logger.debug('Adding constraints to interpolator: {} {} {}'.format(A.shape[0]))
         # print(A.shape,B.shape,idc.shape)
@@ -199,11 +372,13 @@ class DiscreteInterpolator(GeologicalInterpolator):
             # w = w.reshape((A.shape[0]))
         # normalise by rows of A
         length = np.linalg.norm(A, axis=1)  # .getcol(0).norm()
-        B[length > 0] /= length[length > 0]
+        length = np.where(length > 0, length, 1.0)
+        B = B / length
         # going to assume if any are nan they are all nan
         mask = np.any(np.isnan(A), axis=1)
+        contains_nan = mask.any() or np.isnan(B).any()
+        A = A / length[:, None]
         A[mask, :] = 0
-        A[length > 0, :] /= length[length > 0, None]
         if isinstance(w, (float, int)):
             w = np.ones(A.shape[0]) * w
         if isinstance(w, np.ndarray) == False:
@@ -214,14 +389,13 @@ class DiscreteInterpolator(GeologicalInterpolator):
             #     w = np.tile(w,(A.shape[1],1)).T
             # else:
             raise BaseException("Weight array does not match number of constraints")
-        if np.any(np.isnan(idc)) or np.any(np.isnan(A)) or np.any(np.isnan(B)):
+        if contains_nan or idc_nan:
             logger.warning(
                 "Constraints contain nan not adding constraints: {}".format(name)
             )
             # return
-        rows = np.arange(0, nr).astype(int)
-        rows += self.c_
-        constraint_ids = rows.copy()
+        rows = np.arange(self.c_, self.c_ + nr, dtype=np.int32)
+        constraint_ids = rows
         base_name = name
         while name in self.constraints:
             count = 0
@@ -229,11 +403,13 @@ class DiscreteInterpolator(GeologicalInterpolator):
                 count = int(name.split("_")[1]) + 1
             name = base_name + "_{}".format(count)
 
-        rows = np.tile(rows, (A.shape[-1], 1)).T
+        # every column of a constraint row has the same row index, a broadcast
+        # view avoids storing a copy for each column
+        rows = np.broadcast_to(rows[:, None], A.shape)
         self.constraints[name] = {
             "node_indexes": constraint_ids,
             "A": A,
-            "B": B.flatten(),
+            "B": B.ravel(),
             "col": idc,
             "w": w,
             "row": rows,
@@ -297,20 +473,21 @@ class DiscreteInterpolator(GeologicalInterpolator):
 
         """
         # map from mesh node index to region node index
-        gi = np.zeros(self.support.n_nodes)
-        gi[:] = -1
-        gi[self.region] = np.arange(0, self.nx)
+        gi = np.full(self.support.n_nodes, -1, dtype=np.int32)
+        gi[self.region] = np.arange(self.nx, dtype=np.int32)
         idc = gi[node_idx]
-        outside = ~(idc == -1)
+        keep = idc >= 0
+        idc = idc[keep]
+        k = idc.shape[0]
 
         self.equal_constraints[name] = {
-            "A": np.ones(idc[outside].shape[0]),
-            "B": values[outside],
-            "col": idc[outside],
+            "A": np.ones(k),
+            "B": np.asarray(values, dtype=np.float64)[keep],
+            "col": idc,
             # "w": w,
-            "row": np.arange(self.eq_const_c, self.eq_const_c + idc[outside].shape[0]),
+            "row": np.arange(self.eq_const_c, self.eq_const_c + k, dtype=np.int32),
         }
-        self.eq_const_c += idc[outside].shape[0]
+        self.eq_const_c += k
 
     def add_non_linear_constraints(self, nonlinear_constraint):
         self.non_linear_constraints.append(nonlinear_constraint)
@@ -340,7 +517,7 @@ class DiscreteInterpolator(GeologicalInterpolator):
         gi[self.region] = np.arange(0, self.nx, dtype=int)
         idc = gi[idc]
         rows = np.arange(self.ineq_const_c, self.ineq_const_c + idc.shape[0])
-        rows = np.tile(rows, (A.shape[-1], 1)).T
+        rows = np.broadcast_to(rows[:, None], (rows.shape[0], A.shape[-1]))
         self.ineq_constraints[name] = {"A": A, "l": l, "col": idc, "u": u, "row": rows}
         self.ineq_const_c += idc.shape[0]
 
@@ -397,7 +574,7 @@ class DiscreteInterpolator(GeologicalInterpolator):
         if points.shape[0] > 1:
             self.add_gradient_orthogonal_constraints(points[:, :3], points[:, 3:6], w)
 
-    def build_matrix(self, square=True, damp=0.0, ie=False):
+    def build_matrix(self, square=True, damp=0.0, ie=False, matrix_free=False):
         """
         Assemble constraints into interpolation matrix. Adds equaltiy
         constraints
@@ -407,6 +584,9 @@ class DiscreteInterpolator(GeologicalInterpolator):
         ----------
         damp: bool
             Flag whether damping should be added to the diagonal of the matrix
+        matrix_free: bool
+            return a LinearOperator for the normal equations instead of
+            forming ATA, only used by iterative solvers
         Returns
         -------
         Interpolation matrix and B
@@ -433,30 +613,36 @@ class DiscreteInterpolator(GeologicalInterpolator):
                 continue
             if c["w"].max() > max_weight:
                 max_weight = c["w"].max()
-        a = []
-        b = []
-        rows = []
-        cols = []
+        self._nnz = 0
+        B = np.zeros(self.c_, dtype=np.float64)
         for c in self.constraints.values():
             if len(c["w"]) == 0:
                 continue
-            aa = (c["A"] * c["w"][:, None] / max_weight).flatten()
-            b.extend((c["B"] * c["w"] / max_weight).tolist())
-            mask = aa == 0
-            a.extend(aa[~mask].tolist())
-            rows.extend(c["row"].flatten()[~mask].tolist())
-            cols.extend(c["col"].flatten()[~mask].tolist())
-
-        A = coo_matrix(
-            (np.array(a), (np.array(rows), cols)), shape=(self.c_, self.nx), dtype=float
-        ).tocsc()  # .tocsr()
-
-        B = np.array(b)
+            B[c["node_indexes"]] = c["B"] * c["w"] / max_weight
+            # reserve for the whole block, zero entries are skipped when packing
+            self._reserve(c["A"].size)
+            self._nnz = _pack_constraints(
+                c["A"],
+                c["w"],
+                max_weight,
+                c["row"],
+                c["col"],
+                self._A_buf,
+                self._row_buf,
+                self._col_buf,
+                self._nnz,
+            )
+        A = self._build_interpolation_matrix((self.c_, self.nx))
+
         if not square:
             logger.info("Using rectangular matrix, equality constraints are not used")
             return A, B
-        ATA = A.T.dot(A)
         ATB = A.T.dot(B)
+        if matrix_free and len(self.equal_constraints) == 0:
+            logger.info("Using matrix free normal equations")
+            return self._normal_equations_operator(A, damp), ATB
+        if not matrix_free:
+            ATA = A.T.dot(A)
         # add a small number to the matrix diagonal to smooth the results
         # can help speed up solving, but might also introduce some errors
 
@@ -472,28 +658,39 @@ class DiscreteInterpolator(GeologicalInterpolator):
             # and d are the equality constraints
             # c are the node values and y are the
             # lagrange multipliers#
+            # each equality constraint is a single entry in its row so the
+            # number of rows bounds the size of the buffers
+            if self.eq_const_C.shape[0] < self.eq_const_c:
+                self.eq_const_C = np.empty(self.eq_const_c, dtype=np.float64)
+                self.eq_const_row = np.empty(self.eq_const_c, dtype=np.int32)
+                self.eq_const_col = np.empty(self.eq_const_c, dtype=np.int32)
+            self.eq_const_d = np.zeros(self.eq_const_c, dtype=np.float64)
             nc = 0
-            a = []
-            rows = []
-            cols = []
-            b = []
             for c in self.equal_constraints.values():
-                b.extend((c["B"]).tolist())
+                self.eq_const_d[c["row"]] = c["B"]
                 aa = c["A"].flatten()
-                mask = aa == 0
-                a.extend(aa[~mask].tolist())
-                rows.extend(c["row"].flatten()[~mask].tolist())
-                cols.extend(c["col"].flatten()[~mask].tolist())
+                mask = aa != 0
+                k = int(np.count_nonzero(mask))
+                self.eq_const_C[nc : nc + k] = aa[mask]
+                self.eq_const_row[nc : nc + k] = c["row"].flatten()[mask]
+                self.eq_const_col[nc : nc + k] = c["col"].flatten()[mask]
+                nc += k
 
             C = coo_matrix(
-                (np.array(a), (np.array(rows), cols)),
+                (
+                    self.eq_const_C[:nc],
+                    (self.eq_const_row[:nc], self.eq_const_col[:nc]),
+                ),
                 shape=(self.eq_const_c, self.nx),
-                dtype=float,
+                dtype=np.float64,
             ).tocsr()
 
-            d = np.array(b)
-            ATA = bmat([[ATA, C.T], [C, None]])
+            d = self.eq_const_d
             ATB = np.hstack([ATB, d])
+            if matrix_free:
+                logger.info("Using matrix free bordered normal equations")
+                return self._normal_equations_operator(A, damp, C), ATB
+            ATA = _border_matrix(ATA, C)
 
         if isinstance(damp, bool):
             if damp == True:
@@ -503,6 +700,8 @@ class DiscreteInterpolator(GeologicalInterpolator):
         if isinstance(damp, float):
             logger.info("Adding eps to matrix diagonal")
             ATA += eye(ATA.shape[0]) * damp
+        # convert once here so the direct solvers can use the matrix as is
+        ATA = ATA.tocsc()
         if len(self.ineq_constraints) > 0 and ie:
             print("using inequality constraints")
             a = []
@@ -531,6 +730,65 @@ class DiscreteInterpolator(GeologicalInterpolator):
             return ATA, ATB, Aie.T.dot(Aie), Aie.T.dot(uie), Aie.T.dot(lie)
         return ATA, ATB
 
+    def _normal_equations_operator(self, A, damp=0.0, C=None):
+        """
+        Linear operator computing (ATA + damp I)x as AT(Ax) so that the
+        normal equations matrix is never formed. If equality constraints
+        are given the operator is the bordered system
+
+        | ATA CT | |c|
+        | C   0  | |y|
+
+        Parameters
+        ----------
+        A : scipy.sparse.matrix
+            rectangular interpolation matrix
+        damp : float or bool, optional
+            value added to the diagonal, True uses machine epsilon
+        C : scipy.sparse.matrix, optional
+            equality constraint matrix, by default None
+
+        Returns
+        -------
+        scipy.sparse.linalg.LinearOperator
+        """
+        if isinstance(damp, bool):
+            damp = np.finfo("float").eps if damp else 0.0
+        A = A.tocsr()
+        AT = A.T.tocsr()
+        n = A.shape[1]
+        # diagonal of ATA is the squared column norms of A, kept for the
+        # jacobi preconditioner
+        diagonal = np.asarray(A.multiply(A).sum(axis=0)).ravel() + damp
+        if C is None:
+
+            def matvec(x):
+                x = x.ravel()
+                return AT.dot(A.dot(x)) + damp * x
+
+            operator = sla.LinearOperator(
+                (n, n), matvec=matvec, rmatvec=matvec, dtype=np.float64
+            )
+            operator.diagonal = diagonal
+            return operator
+        C = C.tocsr()
+        CT = C.T.tocsr()
+        m = C.shape[0]
+
+        def matvec(x):
+            x = x.ravel()
+            y = np.empty(n + m)
+            y[:n] = AT.dot(A.dot(x[:n])) + CT.dot(x[n:])
+            y[n:] = C.dot(x[:n])
+            y += damp * x
+            return y
+
+        operator = sla.LinearOperator(
+            (n + m, n + m), matvec=matvec, rmatvec=matvec, dtype=np.float64
+        )
+        operator.diagonal = np.hstack([diagonal, np.full(m, damp)])
+        return operator
+
     def _solve_osqp(self, P, A, q, l, u, mkl=False):
         """Wrapper to use osqp solver
 
@@ -598,16 +856,40 @@ class DiscreteInterpolator(GeologicalInterpolator):
         Parameters
         ----------
         A : scipy square sparse matrix
+            csc matrix as returned by build_matrix
         B : numpy vector
 
         Returns
         -------
 
         """
-        lu = sla.splu(A.tocsc())
+        lu = sla.splu(A)
         sol = lu.solve(B)
         return sol[: self.nx]
 
+    @staticmethod
+    def _same_pattern(cache, A):
+        """Check whether a sparse matrix has the sparsity pattern stored in a
+        solver cache
+
+        Parameters
+        ----------
+        cache : dict or None
+            cache with shape, indptr and indices of a compressed matrix
+        A : scipy.sparse.csc_matrix
+            matrix to compare
+
+        Returns
+        -------
+        bool
+        """
+        return (
+            cache is not None
+            and cache["shape"] == A.shape
+            and np.array_equal(cache["indptr"], A.indptr)
+            and np.array_equal(cache["indices"], A.indices)
+        )
+
     def _solve_lsqr(self, A, B, **kwargs):
         """
         Call scipy lsqr
@@ -643,6 +925,46 @@ class DiscreteInterpolator(GeologicalInterpolator):
             lsqrargs["conlim"] = kwargs["conlim"]
         return sla.lsqr(A, B, **lsqrargs)[0]
 
+    def _solve_lsmr(self, A, B, **kwargs):
+        """
+        Call scipy lsmr
+
+        Parameters
+        ----------
+        A : rectangular sparse matrix
+        B : vector
+
+        Returns
+        -------
+
+        """
+
+        lsmrargs = {}
+        lsmrargs["btol"] = 1e-12
+        # the system is inconsistent so only atol can stop the iterations
+        # before maxiter, 1e-8 gives the same residual to about 10 digits
+        lsmrargs["atol"] = 1e-8
+        if "maxiter" in kwargs:
+            logger.info("Using %i maximum iterations" % kwargs["maxiter"])
+            lsmrargs["maxiter"] = kwargs["maxiter"]
+        if "damp" in kwargs:
+            logger.info("Using damping coefficient")
+            lsmrargs["damp"] = kwargs["damp"]
+        if "atol" in kwargs:
+            logger.info("Using a tolerance of %f" % kwargs["atol"])
+            lsmrargs["atol"] = kwargs["atol"]
+        if "btol" in kwargs:
+            logger.info("Using btol of %f" % kwargs["btol"])
+            lsmrargs["btol"] = kwargs["btol"]
+        if "show" in kwargs:
+            lsmrargs["show"] = kwargs["show"]
+        if "conlim" in kwargs:
+            lsmrargs["conlim"] = kwargs["conlim"]
+        if "x0" in kwargs:
+            logger.info("Using starting guess")
+            lsmrargs["x0"] = kwargs["x0"]
+        return sla.lsmr(A, B, **lsmrargs)[0]
+
     def _solve_chol(self, A, B):
         """
         Call suitesparse cholmod through scikitsparse
@@ -650,7 +972,7 @@ class DiscreteInterpolator(GeologicalInterpolator):
 
         Parameters
         ----------
-        A : scipy.sparse.matrix
+        A : scipy.sparse.csc_matrix
             square sparse matrix
         B : numpy array
             RHS of equation
@@ -662,13 +984,24 @@ class DiscreteInterpolator(GeologicalInterpolator):
         try:
             from sksparse.cholmod import cholesky
 
-            factor = cholesky(A.tocsc())
+            if self._same_pattern(self._chol_cache, A):
+                # reuse the symbolic analysis and only refactorise
+                factor = self._chol_cache["factor"]
+                factor.cholesky_inplace(A)
+            else:
+                factor = cholesky(A)
+                self._chol_cache = {
+                    "shape": A.shape,
+                    "indptr": A.indptr.copy(),
+                    "indices": A.indices.copy(),
+                    "factor": factor,
+                }
             return factor(B)[: self.nx]
         except ImportError:
             logger.warning("Scikit Sparse not installed try using cg instead")
             return False
 
-    def _solve_cg(self, A, B, precon=None, **kwargs):
+    def _solve_cg(self, A, B, precon="jacobi", **kwargs):
         """
         Call scipy conjugate gradient
 
@@ -677,8 +1010,11 @@ class DiscreteInterpolator(GeologicalInterpolator):
         A : scipy.sparse.matrix
             square sparse matrix
         B : numpy vector
-        precon : scipy.sparse.matrix
-            a preconditioner for the conjugate gradient system
+        precon : string or function, optional
+            preconditioner for the conjugate gradient system, 'jacobi' (default)
+            scales by the inverse of the diagonal, None for no preconditioner or
+            a function returning a symmetric positive definite preconditioner
+            given A
         kwargs
             kwargs to pass to scipy solve e.g. atol, btol, callback etc
 
@@ -703,9 +1039,47 @@ class DiscreteInterpolator(GeologicalInterpolator):
             cgargs["atol"] = kwargs["atol"]
         if "callback" in kwargs:
             cgargs["callback"] = kwargs["callback"]
-        if precon is not None:
+        if precon == "jacobi":
+            d = self._diagonal(A)
+            # the lagrange multipliers of a bordered system have no diagonal
+            # entries so they are left unscaled
+            d[self.nx :] = 1.0
+            d[d == 0] = 1.0
+            cgargs["M"] = sla.LinearOperator(
+                A.shape, matvec=lambda x: x.ravel() / d, dtype=np.float64
+            )
+        elif callable(precon):
             cgargs["M"] = precon(A)
-        return sla.cg(A, B, **cgargs)[0][: self.nx]
+        elif precon is not None:
+            raise ValueError(
+                "Unknown preconditioner {}, use 'jacobi', None or a function".format(
+                    precon
+                )
+            )
+        x, info = sla.cg(A, B, **cgargs)
+        if info > 0:
+            logger.warning(
+                "cg did not converge after {} iterations, the solution may be "
+                "inaccurate".format(info)
+            )
+        return x[: self.nx]
+
+    @staticmethod
+    def _diagonal(A):
+        """Diagonal of a sparse matrix or of a matrix free operator built
+        by _normal_equations_operator
+
+        Parameters
+        ----------
+        A : scipy.sparse.matrix or scipy.sparse.linalg.LinearOperator
+
+        Returns
+        -------
+        np.ndarray
+        """
+        if isinstance(A, sla.LinearOperator):
+            return A.diagonal.copy()
+        return A.diagonal()
 
     def _solve_pyamg(self, A, B, tol=1e-12, x0=None, verb=False, **kwargs):
         """
@@ -714,6 +1088,7 @@ class DiscreteInterpolator(GeologicalInterpolator):
         Parameters
         ----------
         A :  scipy.sparse.matrix
+            converted to csr before calling pyamg
         B : numpy array
 
         Returns
@@ -723,7 +1098,8 @@ class DiscreteInterpolator(GeologicalInterpolator):
         import pyamg
 
         logger.info("Solving using pyamg: tol {}".format(tol))
-        return pyamg.solve(A, B, tol=tol, x0=x0, verb=verb)[: self.nx]
+        # build_matrix returns csc for the direct solvers, pyamg expects csr
+        return pyamg.solve(A.tocsr(), B, tol=tol, x0=x0, verb=verb)[: self.nx]
 
     def _solve(self, solver="cg", **kwargs):
         """
@@ -734,9 +1110,10 @@ class DiscreteInterpolator(GeologicalInterpolator):
         Parameters
         ----------
         solver : string
-            solver e.g. cg, lu, chol, custom
+            solver e.g. cg, lu, chol, lsqr, lsmr, custom
         kwargs
             kwargs for solver e.g. maxiter, preconditioner etc, damping for
+            the matrix. matrix_free=True with cg avoids assembling ATA
 
         Returns
         -------
@@ -753,10 +1130,12 @@ class DiscreteInterpolator(GeologicalInterpolator):
         if solver == "lu":
             logger.info("Forcing matrix damping for LU")
             damp = True
-        if solver == "lsqr":
+        if solver in ["lsqr", "lsmr"]:
             A, B = self.build_matrix(False)
         elif solver == "osqp":
             P, q, A, l, u = self.build_matrix(True, ie=True)
+        elif solver == "cg" and kwargs.get("matrix_free", False):
+            A, B = self.build_matrix(damp=damp, matrix_free=True)
         else:
             A, B = self.build_matrix(damp=damp)
         # run the chosen solver
@@ -777,6 +1156,9 @@ class DiscreteInterpolator(GeologicalInterpolator):
                 self.c[self.region] = self._solve_cg(A, B)
         if solver == "lsqr":
             self.c[self.region] = self._solve_lsqr(A, B, **kwargs)
+        if solver == "lsmr":
+            logger.info("Solving using lsmr")
+            self.c[self.region] = self._solve_lsmr(A, B, **kwargs)
         if solver == "external":
             logger.warning("Using external solver")
             self.c[self.region] = kwargs["external"](A, B)[: self.nx]
@@ -834,14 +1216,19 @@ class DiscreteInterpolator(GeologicalInterpolator):
         np.ndarray
             value of the interpolator
         """
-        evaluation_points = np.array(evaluation_points)
-        evaluated = np.zeros(evaluation_points.shape[0])
-        mask = np.any(evaluation_points == np.nan, axis=1)
-
-        if evaluation_points[~mask, :].shape[0] > 0:
-            evaluated[~mask] = self.support.evaluate_value(
-                evaluation_points[~mask], self.c
-            )
+        # only copies if the points are not already a contiguous float array
+        evaluation_points = np.ascontiguousarray(evaluation_points, dtype=float)
+        evaluated = np.empty(evaluation_points.shape[0])
+        # nan != nan so the mask has to be found with isnan
+        mask = np.isnan(evaluation_points).any(axis=1)
+        evaluated[mask] = np.nan
+        if mask.any():
+            if not mask.all():
+                evaluated[~mask] = self.support.evaluate_value(
+                    evaluation_points[~mask], self.c
+                )
+        elif evaluation_points.shape[0] > 0:
+            evaluated[:] = self.support.evaluate_value(evaluation_points, self.c)
         return evaluated
 
     def evaluate_gradient(self, evaluation_points: np.ndarray) -> np.ndarray:
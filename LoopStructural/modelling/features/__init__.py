@@ -32,4 +32,3 @@ from ._cross_product_geological_feature import CrossProductGeologicalFeature
 
 from ._unconformity_feature import UnconformityFeature
 from ._analytical_feature import AnalyticalGeologicalFeature
-from ._structural_frame import StructuralFrame
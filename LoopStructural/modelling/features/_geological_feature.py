@@ -133,6 +133,31 @@ class GeologicalFeature(BaseFeature):
 
         return v
 
+    def support_mask(self, evaluation_points: np.ndarray) -> np.ndarray:
+        """
+        Check which locations are inside the support of the interpolator once
+        the faults have been applied, the feature is nan outside the support
+
+        Parameters
+        ----------
+        evaluation_points : np.ndarray
+            Nx3 array of xyz locations
+
+        Returns
+        -------
+        np.ndarray
+            boolean mask, True where the location is inside the support. All
+            True if the interpolator has no support, e.g. surfe
+        """
+        if evaluation_points.shape[1] != 3:
+            raise LoopValueError("Need Nx3 array of xyz points to check support")
+        support = getattr(self.interpolator, "support", None)
+        if support is None:
+            return np.ones(evaluation_points.shape[0], dtype=bool)
+        self.builder.up_to_date()
+        evaluation_points = self._apply_faults(evaluation_points)
+        return support.inside(evaluation_points)
+
     def evaluate_gradient_misfit(self):
         """
 
@@ -1,64 +1,46 @@
-import random as rd
-
-# import scipy as sc
-import scipy.stats as sct
-
 import numpy as np
+import pandas as pd
 
 from ...utils import getLogger
 
 logger = getLogger(__name__)
 
 
+# geometric scaling parameters for each intrusion type as
+# (a_avg, a_stdv, b_avg, b_stdv)
+_GEOMETRIC_SCALING_PARAMETERS = {
+    "plutons": (0.81, 0.12, 1.08, 1.38),
+    "laccoliths": (0.92, 0.11, 0.12, 0.02),
+    "major_mafic_sills": (0.85, 0.1, 0.01, 0.02),
+    "mesoscale_mafic_sills": (0.49, 0.13, 0.47, 0.33),
+    "minor_mafic_sills": (0.91, 0.25, 0.27, 0.04),
+}
+
+
 def geometric_scaling_parameters(intrusion_type):
 
-    geom_scaling_a_avg = {
-        "plutons": 0.81,
-        "laccoliths": 0.92,
-        "major_mafic_sills": 0.85,
-        "mesoscale_mafic_sills": 0.49,
-        "minor_mafic_sills": 0.91,
-    }
-    geom_scaling_a_stdv = {
-        "plutons": 0.12,
-        "laccoliths": 0.11,
-        "major_mafic_sills": 0.1,
-        "mesoscale_mafic_sills": 0.13,
-        "minor_mafic_sills": 0.25,
-    }
-    geom_scaling_b_avg = {
-        "plutons": 1.08,
-        "laccoliths": 0.12,
-        "major_mafic_sills": 0.01,
-        "mesoscale_mafic_sills": 0.47,
-        "minor_mafic_sills": 0.27,
-    }
-    geom_scaling_b_stdv = {
-        "plutons": 1.38,
-        "laccoliths": 0.02,
-        "major_mafic_sills": 0.02,
-        "mesoscale_mafic_sills": 0.33,
-        "minor_mafic_sills": 0.04,
-    }
-
-    a_avg = geom_scaling_a_avg.get(intrusion_type)
-    a_stdv = geom_scaling_a_stdv.get(intrusion_type)
-    b_avg = geom_scaling_b_avg.get(intrusion_type)
-    b_stdv = geom_scaling_b_stdv.get(intrusion_type)
-
-    return a_avg, a_stdv, b_avg, b_stdv
-
-
-def thickness_from_geometric_scaling(length, intrusion_type):
+    try:
+        return _GEOMETRIC_SCALING_PARAMETERS[intrusion_type]
+    except KeyError:
+        raise KeyError(
+            "Unknown intrusion type {}, use one of {}".format(
+                intrusion_type, ", ".join(_GEOMETRIC_SCALING_PARAMETERS)
+            )
+        )
+
+
+def thickness_from_geometric_scaling(length, intrusion_type, rng=None):
 
     a_avg, a_stdv, b_avg, b_stdv = geometric_scaling_parameters(intrusion_type)
 
     n_realizations = 10000
-    maxT = 0
-    a = sct.norm.ppf(np.random.rand(n_realizations), loc=a_avg, scale=a_stdv)
-    b = sct.norm.ppf(np.random.rand(n_realizations), loc=b_avg, scale=b_stdv)
+    # default to the global generator so np.random.seed makes it reproducible
+    if rng is None:
+        rng = np.random
+    a = rng.normal(a_avg, a_stdv, n_realizations)
+    b = rng.normal(b_avg, b_stdv, n_realizations)
     maxT = b * np.power(length, a)
-    maxT[maxT < 0] = None
+    maxT[maxT < 0] = np.nan
     mean_t = np.nanmean(maxT)
 
     logger.info("Building intrusion of thickness {}".format(mean_t))
@@ -68,11 +50,14 @@ def thickness_from_geometric_scaling(length, intrusion_type):
 
 def contact_pts_using_geometric_scaling(thickness, points_df, inflation_vector):
 
-    translation_vector = (
-        inflation_vector
-        / np.linalg.norm(inflation_vector, axis=1).reshape(1, len(inflation_vector)).T
-    ) * thickness
-    points_translated = points_df.loc[:, ["X", "Y", "Z"]].copy() + translation_vector
-    points_translated_xyz = points_translated.to_numpy()
+    inflation_vector = np.asarray(inflation_vector, dtype=float)
+    norms = np.linalg.norm(inflation_vector, axis=1)[:, None]
+    translation_vector = inflation_vector / norms * thickness
+    points_translated_xyz = (
+        points_df.loc[:, ["X", "Y", "Z"]].to_numpy(dtype=float) + translation_vector
+    )
+    points_translated = pd.DataFrame(
+        points_translated_xyz, columns=["X", "Y", "Z"], index=points_df.index
+    )
 
     return points_translated, points_translated_xyz
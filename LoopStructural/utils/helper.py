@@ -212,57 +212,46 @@ def create_surface(bounding_box, nstep):
     )
     corner_gi = corner_gi.reshape((nstep[0] - 1) * (nstep[1] - 1), 4)
     tri = np.vstack([corner_gi[:, :3], corner_gi[:, 1:]])
-    return tri, xx.flatten(), yy.flatten()
+    return tri, xx.ravel(), yy.ravel()
 
 
 def create_box(bounding_box, nsteps):
-    tri, xx, yy = create_surface(bounding_box[0:2, :], nsteps[0:2])
-
-    zz = np.zeros(xx.shape)
-    zz[:] = bounding_box[1, 2]
-
-    tri = np.vstack([tri, tri + np.max(tri) + 1])
-    xx = np.hstack([xx, xx])
-    yy = np.hstack([yy, yy])
-
-    z = np.zeros(zz.shape)
-    z[:] = bounding_box[0, 2]
-    zz = np.hstack([zz, z])
-    # y faces
-    t, x, z = create_surface(bounding_box[:, [0, 2]], nsteps[[0, 2]])
-    tri = np.vstack([tri, t + np.max(tri) + 1])
-
-    y = np.zeros(x.shape)
-    y[:] = bounding_box[0, 1]
-    xx = np.hstack([xx, x])
-    zz = np.hstack([zz, z])
-    yy = np.hstack([yy, y])
-
-    tri = np.vstack([tri, t + np.max(tri) + 1])
-    y[:] = bounding_box[1, 1]
-    xx = np.hstack([xx, x])
-    zz = np.hstack([zz, z])
-    yy = np.hstack([yy, y])
-
-    # x faces
-    t, y, z = create_surface(bounding_box[:, [1, 2]], nsteps[[1, 2]])
-    tri = np.vstack([tri, t + np.max(tri) + 1])
-    x = np.zeros(y.shape)
-    x[:] = bounding_box[0, 0]
-    xx = np.hstack([xx, x])
-    zz = np.hstack([zz, z])
-    yy = np.hstack([yy, y])
-
-    tri = np.vstack([tri, t + np.max(tri) + 1])
-    x[:] = bounding_box[1, 0]
-    xx = np.hstack([xx, x])
-    zz = np.hstack([zz, z])
-    yy = np.hstack([yy, y])
-
-    points = np.zeros((len(xx), 3))  #
-    points[:, 0] = xx
-    points[:, 1] = yy
-    points[:, 2] = zz
+    bounding_box = np.asarray(bounding_box)
+    nsteps = np.asarray(nsteps)
+    # opposite faces share a triangulation, each entry is the axes of the
+    # face plane, the normal axis and the bounding box rows of the two faces
+    faces = [([0, 1], 2, (1, 0)), ([0, 2], 1, (0, 1)), ([1, 2], 0, (0, 1))]
+    n_points = 0
+    n_tri = 0
+    for plane, _, _ in faces:
+        nx, ny = nsteps[plane]
+        n_points += 2 * nx * ny
+        n_tri += 4 * (nx - 1) * (ny - 1)
+    points = np.empty((n_points, 3))
+    tri = np.empty((n_tri, 3), dtype=int)
+    vtx_off = 0
+    tri_off = 0
+    for plane, normal, rows in faces:
+        nx, ny = nsteps[plane]
+        # same layout as create_surface, vertex i + j * nx and two
+        # triangles per cell split along the (i+1, j) (i, j+1) diagonal
+        i, j = np.indices((nx - 1, ny - 1))
+        c = (i + j * nx).ravel()
+        nc = c.shape[0]
+        t = np.empty((2 * nc, 3), dtype=int)
+        t[:nc] = np.stack([c, c + 1, c + nx], axis=-1)
+        t[nc:] = np.stack([c + 1, c + nx, c + nx + 1], axis=-1)
+        a = np.linspace(bounding_box[0, plane[0]], bounding_box[1, plane[0]], nx)
+        b = np.linspace(bounding_box[0, plane[1]], bounding_box[1, plane[1]], ny)
+        nv = nx * ny
+        for r in rows:
+            face = points[vtx_off : vtx_off + nv].reshape(ny, nx, 3)
+            face[:, :, plane[0]] = a[None, :]
+            face[:, :, plane[1]] = b[:, None]
+            face[:, :, normal] = bounding_box[r, normal]
+            tri[tri_off : tri_off + 2 * nc] = t + vtx_off
+            vtx_off += nv
+            tri_off += 2 * nc
     return points, tri
 
 
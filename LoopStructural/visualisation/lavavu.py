@@ -84,8 +84,10 @@ class LavaVuModelViewer(BaseModelPlotter):
         """
         kwargs = self._parse_kwargs(kwargs)
         surf = self.lv.triangles(name)
-        surf.vertices(vertices)
-        surf.indices(faces)
+        # lavavu stores vertices as float32 and indices as uint32, converting
+        # here avoids a second copy inside lavavu
+        surf.vertices(np.ascontiguousarray(vertices, dtype=np.float32))
+        surf.indices(np.ascontiguousarray(faces, dtype=np.uint32))
         if paint_with is None:
             surf.colours(colour)
         surf["opacity"] = kwargs.get("opacity", 1)
@@ -139,7 +141,7 @@ class LavaVuModelViewer(BaseModelPlotter):
         if name is None:
             name = "Unnamed points"
         p = self.lv.points(name, **kwargs)
-        p.vertices(points)
+        p.vertices(np.ascontiguousarray(points, dtype=np.float32))
         if value is None and c is not None:
             value = c
         if value is not None:
@@ -181,6 +183,8 @@ class LavaVuModelViewer(BaseModelPlotter):
             raise ValueError("Location array must have at least one element")
         if name is None:
             name = "Unnamed points"
+        location = np.ascontiguousarray(location, dtype=np.float32)
+        vector = np.ascontiguousarray(vector, dtype=np.float32)
         if symbol_type == "arrow":
             vectorfield = self.lv.vectors(name, **kwargs)
             vectorfield.vertices(location)
@@ -134,8 +134,8 @@ class MapView:
             self.bounding_box[0, 1], self.bounding_box[1, 1], self.nsteps[1]
         )
         self.xx, self.yy = np.meshgrid(x, y, indexing="ij")
-        self.xx = self.xx.flatten()
-        self.yy = self.yy.flatten()
+        self.xx = self.xx.ravel()
+        self.yy = self.yy.ravel()
 
     def add_data(self, feature, val=True, grad=True, unfault=False, dip=True, **kwargs):
         """
@@ -333,7 +333,7 @@ class MapView:
 
         zz = np.zeros_like(self.xx)
         zz[:] = z  # self.bounding_box[1,2]
-        pts = np.vstack([self.xx.flatten(), self.yy.flatten(), zz.flatten()])
+        pts = np.vstack([self.xx, self.yy, zz])
         if self.model is None:
             logger.error("Mapview needs a model assigned to plot model on map")
             return
@@ -354,7 +354,7 @@ class MapView:
 
         zz = np.zeros_like(self.xx)
         zz[:] = z  # self.bounding_box[1,2]
-        pts = np.vstack([self.xx.flatten(), self.yy.flatten(), zz.flatten()])
+        pts = np.vstack([self.xx, self.yy, zz])
         if self.model is None:
             logger.error("Mapview needs a model assigned to plot model on map")
             return
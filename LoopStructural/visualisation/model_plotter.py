@@ -4,13 +4,19 @@ from ..utils import LoopImportError
 logger = getLogger(__name__)
 
 
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import weakref
 import numpy as np
 
 try:
     from skimage.measure import marching_cubes
 except ImportError:
     logger.warning("Using deprecated version of scikit-image")
-    from skimage.measure import marching_cubes_lewiner as marching_cubes
+    from skimage.measure import marching_cubes_lewiner
+
+    def marching_cubes(volume, level, method="lewiner", **kwargs):
+        return marching_cubes_lewiner(volume, level, **kwargs)
 
 
 from ..modelling.features import (
@@ -21,6 +27,216 @@ from ..modelling.features import (
 )
 from ..utils.helper import create_surface, get_vectors, create_box
 
+# run marching cubes for multiple isovalues in a thread pool, this only
+# helps if the marching cubes implementation releases the gil
+use_threads = False
+
+# axes of the section plane and the normal axis for add_section
+_SECTION_AXES = {"x": ([1, 2], 0), "y": ([0, 2], 1), "z": ([0, 1], 2)}
+
+# number of features whose values on the dense grid are kept by a viewer
+_EVAL_CACHE_SIZE = 4
+
+# number of points passed to a feature at a time when evaluating on a grid
+_CHUNK_SIZE = 1 << 16
+
+
+def _evaluate_chunked(evaluate, points, shape=()):
+    """Evaluate a function of the points in chunks of _CHUNK_SIZE so the
+    temporaries inside the evaluation stay small for large grids
+
+    Parameters
+    ----------
+    evaluate : callable
+        function of an (N,3) array e.g. feature.evaluate_value
+    points : np.array
+        (N,3) array of points
+    shape : tuple, optional
+        shape of the result for each point, by default ()
+
+    Returns
+    -------
+    np.array
+        (N,)+shape array of the results
+    """
+    out = np.empty((points.shape[0],) + shape)
+    for start in range(0, points.shape[0], _CHUNK_SIZE):
+        end = start + _CHUNK_SIZE
+        out[start:end] = evaluate(points[start:end, :])
+    return out
+
+
+def _grid_points(bounding_box, nsteps, stride=1):
+    """Points of a regular grid covering the bounding box, z decreases
+    fastest so the values can be reshaped to nsteps for marching cubes
+
+    Parameters
+    ----------
+    bounding_box : np.array
+        [[xmin,ymin,zmin], [xmax,ymax,zmax]]
+    nsteps : np.array
+        number of steps in x, y and z
+    stride : int, optional
+        only keep every stride-th node along each axis, by default 1
+
+    Returns
+    -------
+    points : np.array
+        (N,3) array of grid points
+    x, y, z : np.array
+        coordinates of the grid along each axis
+    """
+    x = np.linspace(bounding_box[0, 0], bounding_box[1, 0], nsteps[0])[::stride]
+    y = np.linspace(bounding_box[0, 1], bounding_box[1, 1], nsteps[1])[::stride]
+    z = np.linspace(bounding_box[1, 2], bounding_box[0, 2], nsteps[2])[::stride]
+    shape = (x.shape[0], y.shape[0], z.shape[0])
+    points = np.empty((shape[0] * shape[1] * shape[2], 3))
+    # fill the columns by broadcasting the axes instead of building a meshgrid
+    grid = points.reshape(shape + (3,))
+    grid[..., 0] = x[:, None, None]
+    grid[..., 1] = y[None, :, None]
+    grid[..., 2] = z[None, None, :]
+    return points, x, y, z
+
+
+def _normalise_vectors(vector):
+    """Normalise the rows of a vector array in place
+
+    Parameters
+    ----------
+    vector : np.array
+        (N,3) array of vectors
+
+    Returns
+    -------
+    np.array
+        boolean mask of the vectors that do not contain nan and have a
+        non zero length
+    """
+    # squared length in one pass, nan if any component is nan and nan > 0
+    # is False so the mask drops nan and zero length vectors together
+    length = np.einsum("ij,ij->i", vector, vector)
+    mask = length > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        np.sqrt(length, out=length)
+        np.reciprocal(length, out=length)
+        vector *= length[:, None]
+    return mask
+
+
+def _feature_state(feature, token, seen=None):
+    """Collect the state a feature's values depend on: the solutions of its
+    interpolators, which are reallocated every time they are solved, whether
+    its faults are enabled, its regions and the same state for the features
+    of its frame, its faults and its regions
+
+    Parameters
+    ----------
+    feature : BaseFeature
+        feature to get the state for
+    token : list
+        list the state is appended to
+    seen : set, optional
+        ids of the features already visited, faults and regions can refer
+        back to each other
+
+    Returns
+    -------
+    bool
+        False if the feature depends on something without an interpolator,
+        e.g. a lambda or analytical feature, and cannot be versioned
+    """
+    if seen is None:
+        seen = set()
+    if id(feature) in seen:
+        return True
+    seen.add(id(feature))
+    token.append(getattr(feature, "faults_enabled", None))
+    # fault displacement is applied directly without rebuilding the fault
+    token.append(getattr(feature, "displacement", None))
+    regions = getattr(feature, "regions", [])
+    token.append(len(regions))
+    for region in regions:
+        token.append(region)
+        # regions built from a feature change when the feature is rebuilt
+        region_feature = getattr(region, "feature", None)
+        if region_feature is not None and not _feature_state(
+            region_feature, token, seen
+        ):
+            return False
+    features = [f for f in getattr(feature, "features", []) if f is not None]
+    interpolator = getattr(feature, "interpolator", None)
+    if interpolator is not None:
+        token.append(getattr(interpolator, "c", None))
+    elif not features:
+        return False
+    faults = getattr(feature, "faults", [])
+    token.append(len(faults))
+    for f in features + list(faults):
+        if not _feature_state(f, token, seen):
+            return False
+    return True
+
+
+def _feature_version(feature):
+    """Bring a feature up to date and return a token identifying the
+    current version of the feature
+
+    Parameters
+    ----------
+    feature : BaseFeature
+        feature to update
+
+    Returns
+    -------
+    tuple or None
+        version token, compare with _same_version. None if the feature
+        cannot be versioned and should not be cached
+    """
+    builder = getattr(feature, "builder", None)
+    if builder is not None:
+        builder.up_to_date()
+    token = []
+    if not _feature_state(feature, token):
+        return None
+    return tuple(token)
+
+
+def _same_version(token, other):
+    return len(token) == len(other) and all(a is b for a, b in zip(token, other))
+
+
+def _cache_get(cache, feature, version):
+    """Cached value for a feature if it was stored for the same version of
+    the same feature, otherwise None
+    """
+    entry = cache.get(id(feature))
+    if entry is None or version is None:
+        return None
+    # the weak reference makes sure a reused id is not mistaken for the
+    # same feature without keeping the feature alive
+    ref, cached_version, value = entry
+    if ref() is not feature or not _same_version(cached_version, version):
+        del cache[id(feature)]
+        return None
+    cache.move_to_end(id(feature))
+    return value
+
+
+def _cache_put(cache, feature, version, value, maxsize=None):
+    """Store a value for a feature, dropping the least recently used
+    entries if the cache has more than maxsize entries. Nothing is stored
+    if the feature has no version
+    """
+    if version is None:
+        cache.pop(id(feature), None)
+        return
+    cache[id(feature)] = (weakref.ref(feature), version, value)
+    cache.move_to_end(id(feature))
+    if maxsize is not None:
+        while len(cache) > maxsize:
+            cache.popitem(last=False)
+
 
 class BaseModelPlotter:
     def __init__(self, model=None):
@@ -33,6 +249,12 @@ class BaseModelPlotter:
         self.model = model
         self.default_vector_symbol = "disk"
         self.default_cmap = "rainbow"
+        # regular grid used for isosurfacing and the values of the features
+        # evaluated on it, reused while the bounding box and nsteps are unchanged
+        self._grid_cache = None
+        self._eval_cache = OrderedDict()
+        # min and max of the features, used for colourmap ranges
+        self._stats = OrderedDict()
 
     @property
     def model(self):
@@ -97,6 +319,97 @@ class BaseModelPlotter:
     def nsteps(self, nsteps: np.ndarray):
         self._nsteps = np.array(nsteps)
 
+    def _get_dense_grid(self):
+        """Regular grid covering the bounding box with nsteps, the grid is
+        cached and only rebuilt when the bounding box or nsteps change
+
+        Returns
+        -------
+        points : np.array
+            (N,3) read only array of grid points
+        step_vector : np.array
+            grid spacing in x, y and z
+        """
+        bounding_box = np.asarray(self.bounding_box, dtype=float)
+        key = (bounding_box.tobytes(), tuple(np.asarray(self.nsteps).tolist()))
+        if self._grid_cache is None or self._grid_cache[0] != key:
+            points, x, y, z = _grid_points(bounding_box, self.nsteps)
+            points.flags.writeable = False
+            step_vector = np.array([x[1] - x[0], y[1] - y[0], z[1] - z[0]])
+            self._grid_cache = (key, points, step_vector)
+            self._eval_cache.clear()
+        return self._grid_cache[1], self._grid_cache[2]
+
+    def _evaluate_on_grid(self, geological_feature, update=False, mask=None):
+        """Value of a feature on the dense grid, cached per feature. The
+        feature is brought up to date first and the cached values are only
+        used if the feature has not been rebuilt since they were evaluated
+
+        Parameters
+        ----------
+        geological_feature : BaseFeature
+            feature to evaluate
+        update : bool, optional
+            re-evaluate the feature even if cached values exist, by default False
+        mask : np.array, optional
+            boolean mask of the grid points that are needed, if there are no
+            cached values only these points are evaluated and the others are
+            nan. Values evaluated with a mask are not cached, by default None
+
+        Returns
+        -------
+        np.array
+            read only array of the feature values on the grid
+        """
+        points, _ = self._get_dense_grid()
+        version = _feature_version(geological_feature)
+        val = None
+        if not update:
+            val = _cache_get(self._eval_cache, geological_feature, version)
+        if val is None:
+            if mask is not None:
+                val = np.full(points.shape[0], np.nan)
+                val[mask] = _evaluate_chunked(
+                    geological_feature.evaluate_value, points[mask, :]
+                )
+                val.flags.writeable = False
+                return val
+            val = _evaluate_chunked(geological_feature.evaluate_value, points)
+            val.flags.writeable = False
+            _cache_put(
+                self._eval_cache,
+                geological_feature,
+                version,
+                val,
+                maxsize=_EVAL_CACHE_SIZE,
+            )
+        return val
+
+    def _feature_range(self, feature, update=False):
+        """Minimum and maximum of a feature in the model, cached per feature
+        until the feature is rebuilt
+
+        Parameters
+        ----------
+        feature : BaseFeature
+            feature to calculate the range of
+        update : bool, optional
+            recalculate the range even if it is cached, by default False
+
+        Returns
+        -------
+        tuple
+            (min, max) of the feature
+        """
+        version = _feature_version(feature)
+        value_range = None
+        if not update:
+            value_range = _cache_get(self._stats, feature, version)
+        if value_range is None:
+            value_range = (feature.min(), feature.max())
+            _cache_put(self._stats, feature, version, value_range)
+        return value_range
+
     def _add_surface(
         self, tri, vertices, name, colour="red", paint_with=None, **kwargs
     ):
@@ -175,28 +488,12 @@ class BaseModelPlotter:
         -------
 
         """
-        if axis == "x":
-            tri, yy, zz = create_surface(
-                self.bounding_box[:, [1, 2]], self.nsteps[[1, 2]]
-            )
-            xx = np.zeros(zz.shape)
-            if value is None:
-                value = np.nanmean(self.bounding_box[:, 0])
-            xx[:] = value
-        if axis == "y":
-            tri, xx, zz = create_surface(
-                self.bounding_box[:, [0, 2]], self.nsteps[[0, 2]]
-            )
-            yy = np.zeros(xx.shape)
-            if value is None:
-                value = np.nanmean(self.bounding_box[:, 1])
-            yy[:] = value
-        if axis == "z":
-            tri, xx, yy = create_surface(self.bounding_box[:, 0:2], self.nsteps[0:2])
-            zz = np.zeros(xx.shape)
-            if value is None:
-                value = np.nanmean(self.bounding_box[:, 2])
-            zz[:] = value
+        if axis not in _SECTION_AXES:
+            raise ValueError(f"Unknown section axis {axis}, use one of x, y, z")
+        plane, normal = _SECTION_AXES[axis]
+        tri, a, b = create_surface(self.bounding_box[:, plane], self.nsteps[plane])
+        if value is None:
+            value = np.nanmean(self.bounding_box[:, normal])
         if geological_feature == "model" and self.model is not None:
             name = kwargs.get("name", "model_section")
             if paint_with == None:
@@ -215,10 +512,10 @@ class BaseModelPlotter:
         colour = kwargs.get("colour", "red")
 
         # create an array to evaluate the feature on for the section
-        points = np.zeros((len(xx), 3))  #
-        points[:, 0] = xx
-        points[:, 1] = yy
-        points[:, 2] = zz
+        points = np.empty((a.shape[0], 3))
+        points[:, plane[0]] = a
+        points[:, plane[1]] = b
+        points[:, normal] = value
 
         # set the surface to be painted with the geological feature, but if a painter is specified, use that instead
         # if 'paint_with' not in kwargs:
@@ -279,6 +576,12 @@ class BaseModelPlotter:
         callback_function:
             called with verts, tri and surface name - e.g.
             callback_function(verts,tri,name)
+        update: bool, optional
+            re-evaluate the feature instead of using values cached from a
+            previous call, by default False
+        step_size: int, optional
+            step size in voxels used by marching cubes, larger steps give a
+            faster coarser surface, by default 1
 
         Returns
         -------
@@ -291,36 +594,36 @@ class BaseModelPlotter:
         # update the feature to make sure its current
 
         # do isosurfacing of support using marching tetras/cubes
-        x = np.linspace(
-            self.bounding_box[0, 0], self.bounding_box[1, 0], self.nsteps[0]
-        )
-        y = np.linspace(
-            self.bounding_box[0, 1], self.bounding_box[1, 1], self.nsteps[1]
-        )
-        z = np.linspace(
-            self.bounding_box[1, 2], self.bounding_box[0, 2], self.nsteps[2]
-        )
-        xx, yy, zz = np.meshgrid(x, y, z, indexing="ij")
-        points = np.array([xx.flatten(), yy.flatten(), zz.flatten()]).T
-        val = geological_feature.evaluate_value(points)
-        mean_val = np.nanmean(val)  # geological_feature.mean()
-        max_val = np.nanmax(val)  # geological_feature.max()
-        min_val = np.nanmin(val)  # geological_feature.min()
+        update = kwargs.pop("update", False)
+        step_size = kwargs.pop("step_size", 1)
+        points, step_vector = self._get_dense_grid()
+        # only evaluate the feature inside the region
+        region = kwargs.get("region", None)
+        mask = None
+        if region is not None:
+            # the cached grid is read only, give the callback its own copy
+            mask = np.asarray(region(points.copy()), dtype=bool)
+            if not np.any(mask):
+                logger.warning(
+                    f"{geological_feature.name}: region is empty, no isosurface"
+                )
+                return return_container
+        val = self._evaluate_on_grid(geological_feature, update=update, mask=mask)
+        inside = val if mask is None else val[mask]
+        mean_val = np.nanmean(inside)  # geological_feature.mean()
+        max_val = np.nanmax(inside)  # geological_feature.max()
+        min_val = np.nanmin(inside)  # geological_feature.min()
         if paint_with is not None and "vmin" not in kwargs and "vmax" not in kwargs:
             paint_val = np.zeros(points.shape[0])
             if isinstance(paint_with, GeologicalFeature):
-                paint_val = paint_with.evaluate_value(points)
-            if callable(paint_with):
-                paint_val = paint_with(points)
+                paint_val = self._evaluate_on_grid(paint_with, update=update)
+            elif callable(paint_with):
+                paint_val = paint_with(points.copy())
             # get the stats to check what we are plotting
             kwargs["vmin"] = np.nanmin(paint_val)  # geological_feature.min()
             kwargs["vmax"] = np.nanmax(paint_val)  # geological_feature.max()
         # set default parameters
         slices_ = [mean_val]
-        painter = None
-        voxet = None
-        tris = None
-        nodes = None
         # parse kwargs for parameters
         if isovalue is not None:
             slices_ = [isovalue]
@@ -334,41 +637,42 @@ class BaseModelPlotter:
             slices_ = np.linspace(min_val + var * 0.05, max_val - var * 0.05, nslices)
         base_name = kwargs.pop("name", geological_feature.name)
 
-        region = kwargs.get("region", None)
-        if region is not None:
-            val[
-                ~region(np.array([xx.flatten(), yy.flatten(), zz.flatten()]).T)
-            ] = np.nan
+        # marching cubes converts the volume to float32 on every call, so
+        # convert it once for all of the isovalues. This also copies the
+        # cached values before they are masked by the region and dtm
+        volume = val.astype(np.float32)
+        if mask is not None:
+            volume[~mask] = np.nan
         if self.model.dtm is not None:
-            xyz = self.model.rescale(
-                np.array([xx.flatten(), yy.flatten(), zz.flatten()]).T, inplace=False
-            )
+            xyz = self.model.rescale(points, inplace=False)
             dtmv = self.model.dtm(xyz[:, :2])
-            val[xyz[:, 2] > dtmv] = np.nan
-        step_vector = np.array([x[1] - x[0], y[1] - y[0], z[1] - z[0]])
+            volume[xyz[:, 2] > dtmv] = np.nan
+        volume = volume.reshape(self.nsteps, order="C")
+        volume_max = np.nanmax(volume)
+        volume_min = np.nanmin(volume)
+        isovalues = []
         for i, isovalue in enumerate(slices_):
             logger.info(
                 "Creating isosurface of %s at %f" % (geological_feature.name, isovalue)
             )
 
-            if isovalue > np.nanmax(val) or isovalue < np.nanmin(val):
+            if isovalue > volume_max or isovalue < volume_min:
                 logger.warning(
                     f"{geological_feature.name}: Isovalue doesn't exist inside bounding box"
                 )
                 continue
+            isovalues.append((i, isovalue))
+
+        def isosurface(isovalue):
             try:
-                verts, faces, normals, values = marching_cubes(
-                    val.reshape(self.nsteps, order="C"), isovalue, spacing=step_vector
+                return marching_cubes(
+                    volume,
+                    isovalue,
+                    spacing=step_vector,
+                    step_size=step_size,
+                    allow_degenerate=False,
+                    method="lewiner",
                 )
-                verts += np.array(
-                    [
-                        self.bounding_box[0, 0],
-                        self.bounding_box[0, 1],
-                        self.bounding_box[1, 2],
-                    ]
-                )
-                self.model.rescale(verts)
-
             except (ValueError, RuntimeError) as e:
                 print(e)
                 logger.warning(
@@ -376,7 +680,29 @@ class BaseModelPlotter:
                         geological_feature.name, isovalue
                     )
                 )
+                return None
+
+        # the surfaces are created first, optionally in parallel, and then
+        # added to the viewer in order as the viewer is not thread safe
+        if use_threads and len(isovalues) > 1:
+            with ThreadPoolExecutor() as executor:
+                surfaces = list(
+                    executor.map(isosurface, [isovalue for _, isovalue in isovalues])
+                )
+        else:
+            surfaces = [isosurface(isovalue) for _, isovalue in isovalues]
+        for (i, isovalue), surface in zip(isovalues, surfaces):
+            if surface is None:
                 continue
+            verts, faces, normals, values = surface
+            verts += np.array(
+                [
+                    self.bounding_box[0, 0],
+                    self.bounding_box[0, 1],
+                    self.bounding_box[1, 2],
+                ]
+            )
+            self.model.rescale(verts)
 
             name = "{}_{}".format(base_name, isovalue)
             if names is not None and len(names) == len(slices_):
@@ -409,7 +735,7 @@ class BaseModelPlotter:
         self,
         geological_feature,
         name=None,
-        cmap="rainbow",
+        cmap=None,
         vmin=None,
         vmax=None,
         opacity=None,
@@ -426,7 +752,7 @@ class BaseModelPlotter:
             Name of the object for lavavu, needs to be unique for the viewer object,
             by default uses feature name
         cmap : str, optional
-            mpl colourmap reference, by default 'rainbow'
+            mpl colourmap reference, by default None which uses default_cmap
         vmin : double, optional
             minimum value of the colourmap, by default None
         vmax : double, optional
@@ -524,7 +850,7 @@ class BaseModelPlotter:
             **kwargs,
         )
 
-    def add_fault_displacements(self, cmap="rainbow", **kwargs):
+    def add_fault_displacements(self, cmap=None, **kwargs):
         """Add a block model painted by the fault displacement magnitude
 
         Calls fault.displacementfeature.evaluate_value(points) for all faults
@@ -532,7 +858,8 @@ class BaseModelPlotter:
         Parameters
         ----------
         cmap : matplotlib cmap, optional
-            colourmap name or object from mpl
+            colourmap name or object from mpl, by default None which uses
+            default_cmap
 
         Notes
         ------
@@ -628,6 +955,9 @@ class BaseModelPlotter:
         start = time.time()
         logger.info("Updating model")
         self.model.update()
+        # the features may have changed so cached values are stale
+        self._eval_cache.clear()
+        self._stats.clear()
         logger.info("Model update took: {} seconds".format(time.time() - start))
         start = time.time()
         logger.info("Isosurfacing")
@@ -748,7 +1078,12 @@ class BaseModelPlotter:
         Parameters
         ----------
         geological_feature : Geological Feature to evaluate gradient
-        locations : ((N,3)) array of evaluation locations
+        locations : ((N,3)) array of evaluation locations, if not given the
+            vectors are plotted on the model grid subsampled by stride. Pass
+            the locations to plot the vectors at full density
+        stride : int, optional
+            only use every stride-th grid node along each axis when locations
+            are not given, by default 4
         kwargs : kwargs for lavavu vector
 
         Returns
@@ -759,25 +1094,33 @@ class BaseModelPlotter:
         #     raise ValueError("{} is not a GeologicalFeature".format(type(geological_feature)))
         logger.info("Adding vector field for %s " % (geological_feature.name))
         locations = kwargs.get("locations", None)
+        stride = kwargs.pop("stride", 4)
         name = kwargs.get("name", geological_feature.name)
         if locations is None:
-            x = np.linspace(
-                self.bounding_box[0, 0], self.bounding_box[1, 0], self.nsteps[0]
-            )
-            y = np.linspace(
-                self.bounding_box[0, 1], self.bounding_box[1, 1], self.nsteps[1]
-            )
-            z = np.linspace(
-                self.bounding_box[1, 2], self.bounding_box[0, 2], self.nsteps[2]
+            # a glyph at every grid node is too dense to see, subsample the
+            # grid axes instead of evaluating the full grid
+            locations = _grid_points(
+                np.asarray(self.bounding_box, dtype=float), self.nsteps, stride
+            )[0]
+        if hasattr(geological_feature, "support_mask"):
+            # only evaluate the gradient where the feature is supported
+            locations = locations[geological_feature.support_mask(locations), :]
+        vector = _evaluate_chunked(
+            geological_feature.evaluate_gradient, locations, shape=(3,)
+        )
+        # normalise and drop the locations where the gradient is nan or zero
+        mask = _normalise_vectors(vector)
+        if not np.any(mask):
+            logger.warning(
+                f"{geological_feature.name}: gradient is nan or zero at all "
+                "of the locations"
             )
-            xx, yy, zz = np.meshgrid(x, y, z, indexing="ij")
-            locations = np.array([xx.flatten(), yy.flatten(), zz.flatten()]).T
-        vector = geological_feature.evaluate_gradient(locations)
-        # normalise
-        mask = ~np.any(np.isnan(vector), axis=1)
-        vector[mask, :] /= np.linalg.norm(vector[mask, :], axis=1)[:, None]
+            return
         self._add_vector_marker(
-            self.model.rescale(locations, inplace=False), vector, name, **kwargs
+            self.model.rescale(locations[mask, :], inplace=True),
+            vector[mask, :],
+            name,
+            **kwargs,
         )
 
         return
@@ -813,6 +1156,7 @@ class BaseModelPlotter:
             add_tang = kwargs["tang"]
         if "interface" in kwargs:
             add_interface = kwargs["interface"]
+        update = kwargs.pop("update", False)
         if isinstance(feature, StructuralFrame):
             features = feature.features
         else:
@@ -850,7 +1194,7 @@ class BaseModelPlotter:
                     **kwargs,
                 )
             if value.shape[0] > 0 and add_value:
-                kwargs["range"] = [feature.min(), feature.max()]
+                kwargs["range"] = list(self._feature_range(feature, update=update))
                 self.add_value_data(
                     self.model.rescale(value[:, :3], inplace=False),
                     value[:, 3],
@@ -983,7 +1327,14 @@ class BaseModelPlotter:
         # normalise
         if location.shape[0] > 0:
             if normalise:
-                vector /= np.linalg.norm(vector, axis=1)[:, None]
+                # normalise a copy so the caller's data is left untouched
+                vector = np.array(vector, dtype=float)
+                mask = _normalise_vectors(vector)
+                if not np.any(mask):
+                    logger.warning(f"{name}: all of the vectors are nan or zero")
+                    return
+                location = location[mask, :]
+                vector = vector[mask, :]
             self._add_vector_marker(
                 location, vector, name, symbol_type=symbol_type, **kwargs
             )
@@ -1027,17 +1378,7 @@ class BaseModelPlotter:
         """
         locations = kwargs.get("locations", None)
         if locations is None:
-            x = np.linspace(
-                self.bounding_box[0, 0], self.bounding_box[1, 0], self.nsteps[0]
-            )
-            y = np.linspace(
-                self.bounding_box[0, 1], self.bounding_box[1, 1], self.nsteps[1]
-            )
-            z = np.linspace(
-                self.bounding_box[1, 2], self.bounding_box[0, 2], self.nsteps[2]
-            )
-            xx, yy, zz = np.meshgrid(x, y, z, indexing="ij")
-            locations = np.array([xx.flatten(), yy.flatten(), zz.flatten()]).T
+            locations = self._get_dense_grid()[0]
         r2r, fold_axis, dgz = fold.get_deformed_orientation(locations)
         locations = self.model.rescale(locations, inplace=False)
         self.add_vector_data(locations, r2r, fold.name + "_direction", colour="red")
@@ -1,10 +1,88 @@
+import numpy as np
 import pytest
+from LoopStructural.interpolators import FiniteDifferenceInterpolator as FDI
+from LoopStructural.interpolators import StructuredGrid
+from LoopStructural.interpolators._discrete_interpolator import (
+    _pack_constraints,
+    _pack_constraints_loop,
+    _pack_constraints_numpy,
+)
+
+
+def _small_interpolator():
+    grid = StructuredGrid(
+        origin=np.zeros(3), nsteps=np.array([5, 5, 5]), step_vector=np.ones(3) / 4
+    )
+    return FDI(grid)
 
 
 def test_nx():
     pass
 
 
+def test_evaluate_value_nan_points():
+    interpolator = _small_interpolator()
+    interpolator.c = np.arange(interpolator.support.n_nodes, dtype=float)
+    points = np.array([[0.5, 0.5, 0.5], [np.nan, 0.5, 0.5]])
+    values = interpolator.evaluate_value(points)
+    assert ~np.isnan(values[0])
+    assert np.isnan(values[1])
+    assert interpolator.evaluate_value(np.zeros((0, 3))).shape == (0,)
+
+
+def test_build_matrix_rows():
+    interpolator = _small_interpolator()
+    A = np.array([[1.0, 0.0, 2.0], [0.0, 0.0, 0.0], [3.0, 4.0, 0.0]])
+    idc = np.array([[0, 1, 2], [3, 4, 5], [6, 7, 8]])
+    interpolator.add_constraints_to_least_squares(A, np.ones(3), idc, name="a")
+    interpolator.add_constraints_to_least_squares(A[:1], np.ones(1), idc[:1], name="b")
+    M, B = interpolator.build_matrix(square=False)
+    assert M.shape == (4, interpolator.nx)
+    assert np.array_equal(M.indptr, [0, 2, 2, 4, 6])
+    length = np.linalg.norm(A, axis=1)[:, None]
+    length[length == 0] = 1
+    expected = np.zeros((4, interpolator.nx))
+    expected[np.arange(3)[:, None], idc] = A / length
+    expected[3, idc[0]] = A[0] / length[0]
+    assert np.allclose(M.toarray(), expected)
+
+
+def test_add_constraints_does_not_modify_inputs():
+    interpolator = _small_interpolator()
+    A = np.array([[3.0, 4.0], [np.nan, 1.0]])
+    B = np.array([5.0, 1.0])
+    idc = np.array([[0, 1], [2, 3]])
+    interpolator.add_constraints_to_least_squares(A, B, idc, name="a")
+    assert np.array_equal(A, [[3.0, 4.0], [np.nan, 1.0]], equal_nan=True)
+    assert np.array_equal(B, [5.0, 1.0])
+    assert np.allclose(interpolator.constraints["a"]["A"], [[0.6, 0.8], [0, 0]])
+    assert np.allclose(interpolator.constraints["a"]["B"], [1.0, 1.0])
+
+
+@pytest.mark.parametrize(
+    "pack", [_pack_constraints, _pack_constraints_loop, _pack_constraints_numpy]
+)
+def test_pack_constraints(pack):
+    A = np.array(
+        [[1.0, 0.0, 2.0], [np.nan, 3.0, 0.0], [0.0, 0.0, 0.0], [4.0, 5.0, 6.0]]
+    )
+    w = np.array([1.0, 2.0, 0.5, 1.0])
+    # rows are a broadcast view as stored by add_constraints_to_least_squares
+    rows = np.broadcast_to(np.arange(10, 14, dtype=np.int32)[:, None], A.shape)
+    cols = np.arange(A.size, dtype=np.int32).reshape(A.shape)
+    out_A = np.full(20, -1.0)
+    out_row = np.full(20, -1, dtype=np.int32)
+    out_col = np.full(20, -1, dtype=np.int32)
+    nnz = pack(A, w, 2.0, rows, cols, out_A, out_row, out_col, 2)
+    assert nnz == 8
+    assert np.array_equal(out_A[2:nnz], [0.5, 1.0, 3.0, 2.0, 2.5, 3.0])
+    assert np.array_equal(out_row[2:nnz], [10, 10, 11, 13, 13, 13])
+    assert np.array_equal(out_col[2:nnz], [0, 2, 4, 9, 10, 11])
+    # entries outside the written range are untouched
+    assert np.all(out_A[:2] == -1) and np.all(out_A[nnz:] == -1)
+    assert np.all(out_row[nnz:] == -1) and np.all(out_col[nnz:] == -1)
+
+
 @pytest.mark.skip("not currently working 4-10-2022")
 def test_region(interpolator, data):
     """Test to see whether restricting the interpolator to a region works"""
@@ -1,8 +1,12 @@
+import sys
+import types
+
 import numpy as np
 import pandas as pdB
 from LoopStructural.interpolators import FiniteDifferenceInterpolator as FDI
 from LoopStructural.interpolators import StructuredGrid
 import pytest
+import scipy.sparse.linalg as sla
 
 
 @pytest.mark.skip("not currently working 4-10-2022")
@@ -94,6 +98,134 @@ def test_equality_FDI_nodes(interpolator, data):
     interpolator.solve_system(solver="cg")
 
 
+def _sine_interpolator():
+    grid = StructuredGrid(
+        origin=np.zeros(3), nsteps=np.array([10, 10, 10]), step_vector=np.ones(3) / 9
+    )
+    interpolator = FDI(grid)
+    xy = np.array(
+        np.meshgrid(np.linspace(0.1, 0.9, 10), np.linspace(0.1, 0.9, 10))
+    ).T.reshape(-1, 2)
+    xyz = np.hstack([xy, np.zeros((xy.shape[0], 1)) + 0.3])
+    interpolator.set_value_constraints(
+        np.hstack([xyz, np.sin(xyz[:, [0]]), np.ones((xyz.shape[0], 1))])
+    )
+    interpolator.set_gradient_constraints(
+        np.array([[0.5, 0.5, 0.5, 0, 0, 1, 1], [0.75, 0.5, 0.75, 0, 0, 1, 1]])
+    )
+    interpolator.setup_interpolator()
+    return interpolator
+
+
+def test_matrix_free_cg():
+    interpolator = _sine_interpolator()
+    interpolator.solve_system(solver="cg")
+    c = interpolator.c.copy()
+    interpolator.solve_system(solver="cg", matrix_free=True)
+    assert interpolator.valid
+    assert np.allclose(interpolator.c, c, atol=1e-6)
+
+
+def test_matrix_free_cg_equality():
+    grid = StructuredGrid(
+        origin=np.zeros(3), nsteps=np.array([10, 10, 10]), step_vector=np.ones(3) / 9
+    )
+    interpolator = FDI(grid)
+    interpolator.set_value_constraints(np.array([[0.5, 0.5, 0.5, 0.0, 1.0]]))
+    interpolator.setup_interpolator()
+    node_idx = np.arange(0, interpolator.nx)[interpolator.support.nodes[:, 2] > 0.9]
+    interpolator.add_equality_constraints(
+        node_idx, np.ones(node_idx.shape[0]), name="top"
+    )
+    interpolator.solve_system(solver="cg")
+    c = interpolator.c.copy()
+    interpolator.solve_system(solver="cg", matrix_free=True)
+    assert interpolator.valid
+    assert np.allclose(interpolator.c, c, atol=1e-6)
+
+
+def test_lsmr():
+    interpolator = _sine_interpolator()
+    interpolator.solve_system(solver="lsqr")
+    c = interpolator.c.copy()
+    interpolator.solve_system(solver="lsmr")
+    assert interpolator.valid
+    assert np.allclose(interpolator.c, c, atol=1e-4)
+
+
+def test_cg_preconditioners():
+    # the system is rank deficient so compare the least squares residual
+    # rather than the solution
+    interpolator = _sine_interpolator()
+    A, B = interpolator.build_matrix(False)
+    interpolator.solve_system(solver="lu")
+    residual = np.linalg.norm(A @ interpolator.c[interpolator.region] - B)
+    called = []
+
+    def jacobi(A):
+        called.append(True)
+        d = A.diagonal()
+        return sla.LinearOperator(A.shape, matvec=lambda x: x.ravel() / d)
+
+    for precon in ["jacobi", None, jacobi]:
+        interpolator.solve_system(solver="cg", precon=precon)
+        assert interpolator.valid
+        assert np.isclose(
+            np.linalg.norm(A @ interpolator.c[interpolator.region] - B),
+            residual,
+            rtol=1e-6,
+        )
+    assert called
+
+
+def test_cg_unknown_preconditioner():
+    interpolator = _sine_interpolator()
+    with pytest.raises(ValueError):
+        interpolator.solve_system(solver="cg", precon="ilu")
+
+
+def test_cg_not_converged_warning(caplog):
+    interpolator = _sine_interpolator()
+    interpolator.solve_system(solver="cg", maxiter=1)
+    assert "cg did not converge" in caplog.text
+
+
+def test_same_pattern():
+    interpolator = _sine_interpolator()
+    A, _ = interpolator.build_matrix()
+    cache = {"shape": A.shape, "indptr": A.indptr.copy(), "indices": A.indices.copy()}
+    assert interpolator._same_pattern(cache, A)
+    assert interpolator._same_pattern(cache, A * 2.0)
+    assert not interpolator._same_pattern(None, A)
+    B = A.tolil()
+    B[0, A.shape[1] - 1] = 1.0
+    assert not interpolator._same_pattern(cache, B.tocsc())
+
+
+def test_chol_reuses_factor():
+    pytest.importorskip("sksparse")
+    interpolator = _sine_interpolator()
+    interpolator.solve_system(solver="chol")
+    factor = interpolator._chol_cache["factor"]
+    c = interpolator.c.copy()
+    interpolator.solve_system(solver="chol")
+    assert interpolator._chol_cache["factor"] is factor
+    assert np.allclose(interpolator.c, c)
+
+
+def test_pyamg_gets_csr(monkeypatch):
+    formats = []
+
+    def solve(A, B, **kwargs):
+        formats.append(A.format)
+        return sla.spsolve(A, B)
+
+    monkeypatch.setitem(sys.modules, "pyamg", types.SimpleNamespace(solve=solve))
+    interpolator = _sine_interpolator()
+    interpolator.solve_system(solver="pyamg")
+    assert formats == ["csr"]
+
+
 if __name__ == "__main__":
     test_inequality_FDI()
     test_inequality_FDI_nodes()
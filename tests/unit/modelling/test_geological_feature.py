@@ -8,7 +8,9 @@ from LoopStructural.modelling.features import (
     CrossProductGeologicalFeature,
     FeatureType,
 )
+from LoopStructural import GeologicalModel
 import numpy as np
+import pandas as pd
 
 
 def test_constructors():
@@ -51,9 +53,67 @@ def test_tojson():
     json.dumps(base_feature, cls=LoopJSONEncoder)
 
 
+def test_support_mask():
+    model = GeologicalModel([0, 0, 0], [1, 1, 1])
+    model.data = pd.DataFrame(
+        [
+            [0.5, 0.5, 0.3, 0, "strati"],
+            [0.5, 0.5, 0.7, 1, "strati"],
+            [0.2, 0.8, 0.3, 0, "strati"],
+            [0.8, 0.2, 0.7, 1, "strati"],
+        ],
+        columns=["X", "Y", "Z", "val", "feature_name"],
+    )
+    feature = model.create_and_add_foliation("strati", nelements=1e3)
+    support = feature.interpolator.support
+    points = np.array(
+        [
+            (support.origin + support.maximum) / 2,
+            support.origin - 1,
+            support.maximum + 1,
+        ]
+    )
+    assert np.all(feature.support_mask(points) == [True, False, False])
+
+
+def test_support_mask_faulted():
+    model = GeologicalModel([0, 0, 0], [1, 1, 1])
+    columns = ["X", "Y", "Z", "nx", "ny", "nz", "coord", "val", "feature_name"]
+    model.data = pd.DataFrame(
+        [
+            [0.5, 0.5, 0.5, 0, 1, 0, 0, 0, "fault"],
+            [0.5, 0.5, 0.5, 1, 0, 0, 1, 0, "fault"],
+            [0.5, 0.5, 0.5, 0, 0, 1, 2, 0, "fault"],
+            [0.5, 0.5, 0.3, np.nan, np.nan, np.nan, np.nan, 0, "strati"],
+            [0.5, 0.5, 0.7, np.nan, np.nan, np.nan, np.nan, 1, "strati"],
+            [0.2, 0.8, 0.3, np.nan, np.nan, np.nan, np.nan, 0, "strati"],
+            [0.8, 0.2, 0.7, np.nan, np.nan, np.nan, np.nan, 1, "strati"],
+        ],
+        columns=columns,
+    )
+    model.create_and_add_fault("fault", 0.5, nelements=1e3)
+    feature = model.create_and_add_foliation("strati", nelements=1e3)
+    support = feature.interpolator.support
+    points = np.random.default_rng(0).uniform(
+        support.origin - 0.3, support.maximum + 0.3, (2000, 3)
+    )
+    mask = feature.support_mask(points)
+    # the support is checked at the restored locations, not the faulted ones
+    assert np.array_equal(mask, support.inside(feature._apply_faults(points)))
+    assert np.any(mask != support.inside(points))
+
+
+def test_support_mask_without_support():
+    feature = GeologicalFeature("test", object())
+    assert np.all(feature.support_mask(np.zeros((4, 3))))
+
+
 if __name__ == "__main__":
     test_constructors()
     test_toggle_faults()
     test_tojson()
+    test_support_mask()
+    test_support_mask_faulted()
+    test_support_mask_without_support()
     print("All tests passed")
     exit(0)
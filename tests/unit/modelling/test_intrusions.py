@@ -10,6 +10,8 @@ from LoopStructural.modelling.features import StructuralFrame
 from LoopStructural.modelling.intrusions import (
     rectangle_function,
     parallelepiped_function,
+    geometric_scaling_parameters,
+    thickness_from_geometric_scaling,
 )
 
 from LoopStructural.datasets import load_tabular_intrusion
@@ -151,6 +153,29 @@ def test_intrusion_builder():
     assert len(intrusion_feature.growth_simulated_thresholds) > 0
 
 
+def test_geometric_scaling_parameters():
+    assert geometric_scaling_parameters("laccoliths") == (0.92, 0.11, 0.12, 0.02)
+    with pytest.raises(KeyError):
+        geometric_scaling_parameters("not_an_intrusion")
+    assert thickness_from_geometric_scaling(1000.0, "laccoliths") > 0
+
+
+def test_thickness_from_geometric_scaling_reproducible():
+    np.random.seed(0)
+    thickness = thickness_from_geometric_scaling(1000.0, "plutons")
+    np.random.seed(0)
+    assert thickness_from_geometric_scaling(1000.0, "plutons") == thickness
+    thickness = thickness_from_geometric_scaling(
+        1000.0, "plutons", rng=np.random.default_rng(0)
+    )
+    assert (
+        thickness_from_geometric_scaling(
+            1000.0, "plutons", rng=np.random.default_rng(0)
+        )
+        == thickness
+    )
+
+
 # if __name__ == "__main__":
 #     test_intrusion_freame_builder()
 #     test_intrusion_builder()
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+from LoopStructural.utils.helper import create_box, create_surface
+
+
+def _stacked_box(bounding_box, nsteps):
+    # the box built face by face from create_surface, z faces then y then x
+    points = []
+    tri = []
+    n = 0
+    for axes, normal, values in [
+        ([0, 1], 2, [bounding_box[1, 2], bounding_box[0, 2]]),
+        ([0, 2], 1, [bounding_box[0, 1], bounding_box[1, 1]]),
+        ([1, 2], 0, [bounding_box[0, 0], bounding_box[1, 0]]),
+    ]:
+        t, u, v = create_surface(bounding_box[:, axes], nsteps[axes])
+        for value in values:
+            face = np.zeros((u.shape[0], 3))
+            face[:, axes[0]] = u
+            face[:, axes[1]] = v
+            face[:, normal] = value
+            points.append(face)
+            tri.append(t + n)
+            n += u.shape[0]
+    return np.vstack(points), np.vstack(tri)
+
+
+@pytest.mark.parametrize("nsteps", [[2, 2, 2], [3, 4, 5], [10, 7, 3], [2, 9, 2]])
+def test_create_box(nsteps):
+    bounding_box = np.array([[-1.0, 0.0, 2.0], [3.0, 5.0, 4.0]])
+    nsteps = np.array(nsteps)
+    points, tri = create_box(bounding_box, nsteps)
+    expected_points, expected_tri = _stacked_box(bounding_box, nsteps)
+    assert np.allclose(points, expected_points)
+    assert np.array_equal(tri, expected_tri)
@@ -0,0 +1,146 @@
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pytest
+
+pytest.importorskip("skimage")
+import pandas as pd
+from LoopStructural import GeologicalModel
+from LoopStructural.modelling.features import LambdaGeologicalFeature
+from LoopStructural.visualisation import model_plotter
+from LoopStructural.visualisation.model_plotter import (
+    BaseModelPlotter,
+    _grid_points,
+    _normalise_vectors,
+)
+
+
+class _SurfaceRecorder(BaseModelPlotter):
+    def __init__(self, model):
+        super().__init__(model)
+        self.surfaces = {}
+
+    def _add_surface(self, vertices, faces, name, **kwargs):
+        self.surfaces[name] = (np.array(vertices), np.array(faces))
+
+
+def _model_plotter(plotter=BaseModelPlotter):
+    model = GeologicalModel([0, 0, 0], [1, 1, 1])
+    model.data = pd.DataFrame(
+        [
+            [0.5, 0.5, 0.3, 0, "strati"],
+            [0.5, 0.5, 0.7, 1, "strati"],
+            [0.2, 0.8, 0.3, 0, "strati"],
+            [0.8, 0.2, 0.7, 1, "strati"],
+            [0.5, 0.5, 0.3, 0, "strati2"],
+            [0.5, 0.5, 0.7, 1, "strati2"],
+            [0.2, 0.8, 0.7, 0, "strati2"],
+            [0.8, 0.2, 0.3, 1, "strati2"],
+        ],
+        columns=["X", "Y", "Z", "val", "feature_name"],
+    )
+    model.create_and_add_foliation("strati", nelements=1e3)
+    model.create_and_add_foliation("strati2", nelements=1e3)
+    model.update(progressbar=False)
+    plotter = plotter(model)
+    plotter.nsteps = np.array([5, 5, 5])
+    return model, plotter
+
+
+def test_grid_points_ordering():
+    bounding_box = np.array([[0.0, 0.0, 0.0], [1.0, 2.0, 3.0]])
+    nsteps = np.array([3, 4, 5])
+    points, x, y, z = _grid_points(bounding_box, nsteps)
+    # z decreases fastest and runs from the top of the box to the bottom
+    assert z[0] == bounding_box[1, 2] and z[-1] == bounding_box[0, 2]
+    xx, yy, zz = np.meshgrid(x, y, z, indexing="ij")
+    assert np.array_equal(points, np.array([xx.ravel(), yy.ravel(), zz.ravel()]).T)
+    points, xs, ys, zs = _grid_points(bounding_box, nsteps, stride=2)
+    assert np.array_equal(xs, x[::2])
+    assert np.array_equal(ys, y[::2])
+    assert np.array_equal(zs, z[::2])
+    assert points.shape == (xs.shape[0] * ys.shape[0] * zs.shape[0], 3)
+
+
+def test_normalise_vectors():
+    vector = np.array(
+        [[3.0, 4.0, 0.0], [np.nan, 1.0, 0.0], [0.0, 0.0, 0.0], [0.0, 0.0, -2.0]]
+    )
+    mask = _normalise_vectors(vector)
+    assert np.array_equal(mask, [True, False, False, True])
+    assert np.allclose(vector[mask], [[0.6, 0.8, 0.0], [0.0, 0.0, -1.0]])
+
+
+def test_evaluate_on_grid_cache():
+    model, plotter = _model_plotter()
+    feature = model["strati"]
+    val = plotter._evaluate_on_grid(feature)
+    assert plotter._evaluate_on_grid(feature) is val
+    # rebuilding the feature invalidates the cached values
+    feature.builder.build_arguments = {"regularisation": 10.0}
+    rebuilt = plotter._evaluate_on_grid(feature)
+    assert rebuilt is not val
+    points, _ = plotter._get_dense_grid()
+    assert np.allclose(rebuilt, feature.evaluate_value(points), equal_nan=True)
+    # so does toggling the faults
+    feature.toggle_faults()
+    assert plotter._evaluate_on_grid(feature) is not rebuilt
+    assert plotter._evaluate_on_grid(feature, update=True) is not rebuilt
+
+
+def test_evaluate_on_grid_cache_eviction(monkeypatch):
+    monkeypatch.setattr(model_plotter, "_EVAL_CACHE_SIZE", 1)
+    model, plotter = _model_plotter()
+    val = plotter._evaluate_on_grid(model["strati"])
+    plotter._evaluate_on_grid(model["strati2"])
+    assert len(plotter._eval_cache) == 1
+    assert plotter._evaluate_on_grid(model["strati"]) is not val
+
+
+def test_evaluate_on_grid_not_cached_without_interpolator():
+    _, plotter = _model_plotter()
+    feature = LambdaGeologicalFeature(lambda xyz: xyz[:, 0])
+    val = plotter._evaluate_on_grid(feature)
+    assert plotter._evaluate_on_grid(feature) is not val
+    assert len(plotter._eval_cache) == 0
+
+
+def test_feature_range_cache():
+    model, plotter = _model_plotter()
+    feature = model["strati"]
+    value_range = plotter._feature_range(feature)
+    assert value_range == (feature.min(), feature.max())
+    assert plotter._feature_range(feature) is value_range
+    feature.builder.build_arguments = {"regularisation": 10.0}
+    rebuilt = plotter._feature_range(feature)
+    assert rebuilt is not value_range
+    assert rebuilt == (feature.min(), feature.max())
+    feature.toggle_faults()
+    assert plotter._feature_range(feature) is not rebuilt
+    lambda_feature = LambdaGeologicalFeature(lambda xyz: xyz[:, 0], model=model)
+    plotter._feature_range(lambda_feature)
+    assert id(lambda_feature) not in plotter._stats
+
+
+def test_isosurface_threads(monkeypatch):
+    model, plotter = _model_plotter(_SurfaceRecorder)
+    plotter.nsteps = np.array([10, 10, 10])
+    slices = [0.25, 0.5, 0.75]
+    plotter.add_isosurface(model["strati"], slices=slices)
+    serial = plotter.surfaces
+    plotter.surfaces = {}
+    monkeypatch.setattr(model_plotter, "use_threads", True)
+    executors = []
+
+    class Executor(ThreadPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            executors.append(self)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(model_plotter, "ThreadPoolExecutor", Executor)
+    plotter.add_isosurface(model["strati"], slices=slices)
+    assert executors
+    assert len(serial) == len(slices)
+    assert serial.keys() == plotter.surfaces.keys()
+    for name, (vertices, faces) in serial.items():
+        assert np.array_equal(vertices, plotter.surfaces[name][0])
+        assert np.array_equal(faces, plotter.surfaces[name][1])